@@ -1,88 +1,85 @@
 
-import os
 import requests
-from openai import OpenAI
-from openai import OpenAIError
-import anthropic as anthropicai
-import google.generativeai as genai
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from typing import List, Dict, Any
 import gradio as gr
 from datetime import datetime
 
-
 load_dotenv(override=True)
-# Initialize OpenAI client
-openai = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-anthropic = anthropicai.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+
+from cache import cached_stream, prompt_key, semantic_scope
+from providers.async_client import AsyncLLM, batch_stream
+
+# One async client for OpenAI, Claude and Gemini
+llm = AsyncLLM()
 
 
 system_pronpt = [{"role": "system", "content": "You are a comedian that tell jokes."}]
 user_prompt = [{"role": "user", "content": "Tell me a joke about cats."}]
 
-def callOpenAI(input: str):
+async def callOpenAI(input: str):
     prompt = [
             {"role": "system", "content": "You are a comedian that tell jokes."},
             {"role": "user", "content": input}
         ]
 
-    response = openai.chat.completions.create(model = "gpt-4o-mini", messages=prompt)
-    return "\n" + response.choices[0].message.content
+    response = "".join([token async for token in llm.stream("gpt-4o-mini", prompt)])
+    return "\n" + response
+
+async def streamOpenAI(system: str, question: str):
+    system = system if system is not None else "You are a comedian that tell jokes."
+    system_message = [{"role": "system", "content": system}]
+    exact_key = prompt_key("gpt-4o-mini", system_message + [{"role": "user", "content": question}])
+    scope = semantic_scope("gpt-4o-mini", system_message)
+    async for result in cached_stream(question, _streamOpenAI(system, question), exact_key=exact_key, scope=scope):
+        yield result
 
-def streamOpenAI(system: str, question: str):
+async def _streamOpenAI(system: str, question: str):
     prompt = [
-            {"role": "system", "content": system if system is not None else "You are a comedian that tell jokes."},
+            {"role": "system", "content": system},
             {"role": "user", "content": question}
         ]
     
-    result: str = ""
-    response = openai.chat.completions.create(
-        model = "gpt-4o-mini", 
-        messages=prompt
-        , stream=True)
-    for chunk in response:
-        result += chunk.choices[0].delta.content or ""
+    async for result in batch_stream(llm.stream("gpt-4o-mini", prompt)):
         yield result
 
-def callClaude():
-    response = anthropic.messages.create(
-        model="claude-opus-4-1-20250805",
-        max_tokens=1024,
-        temperature=0.7,
-        system="You are a comedian that tell jokes.",
-        messages=[
+async def callClaude():
+    prompt = [
+            {"role": "system", "content": "You are a comedian that tell jokes."},
             {"role": "user", "content": "Tell me a joke about Racoons."}
         ]
-    )
-    print(response.content[0].text)
+    response = "".join([token async for token in llm.stream(
+        "claude-opus-4-1-20250805", prompt, max_tokens=1024, temperature=0.7)])
+    print(response)
 
-def streamClaude(system: str, message: str):
-    response = anthropic.messages.stream(
-        model="claude-opus-4-1-20250805",
-        max_tokens=1024,
-        temperature=0.7,
-        system = system if system is not None else "You are a comedian that tell jokes.",
-        messages = [
+async def streamClaude(system: str, message: str):
+    system = system if system is not None else "You are a comedian that tell jokes."
+    system_message = [{"role": "system", "content": system}]
+    exact_key = prompt_key("claude-opus-4-1-20250805", system_message + [{"role": "user", "content": message}], temperature=0.7)
+    scope = semantic_scope("claude-opus-4-1-20250805", system_message)
+    async for result in cached_stream(message, _streamClaude(system, message), exact_key=exact_key, scope=scope):
+        yield result
+
+async def _streamClaude(system: str, message: str):
+    response = llm.stream(
+        "claude-opus-4-1-20250805",
+        [
+            {"role": "system", "content": system},
             {"role": "user", "content": message}
-        ]
-    )
-    result: str = ""
-    with response as stream:
-        for chunk in stream.text_stream:
-            result += chunk
-            yield result
-
-def callGemini():
-    gemini = genai.GenerativeModel(
-        model_name="gemini-1.5-flash",
-        system_instruction= system_pronpt[0]['content']
+        ],
+        max_tokens=1024,
+        temperature=0.7
     )
-    response = gemini.generate_content(contents="Tell me a joke about Racoons.")
-    print(response.text)
+    async for result in batch_stream(response):
+        yield result
+
+async def callGemini():
+    prompt = system_pronpt + [{"role": "user", "content": "Tell me a joke about Racoons."}]
+    response = "".join([token async for token in llm.stream("gemini-1.5-flash", prompt)])
+    print(response)
 
-#callGemini() 
+#asyncio.run(callGemini()) 
 
 gr.Interface(
     fn=streamClaude,
@@ -1,8 +1,6 @@
 
-import os
 import requests
 import json
-from openai import OpenAI
 from openai import OpenAIError
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
@@ -10,12 +8,14 @@ from typing import List, Dict, Any
 from datetime import datetime  
 from IPython.display import display, Markdown
 
+from providers.clients import openai_client
+
 load_dotenv(override=True)
 # Initialize OpenAI client
 
 MODEL = "gpt-4o-mini"
 
-openai = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+openai = openai_client()
 
 headers = {
  "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
@@ -148,10 +148,20 @@ def get_streamed_brochure(company_name, url):
         ],
         stream=True
     )
-    response = ""
+    # Print only new text; re-printing the cumulative text repeated it. The
+    # last few characters are held back so a fence or "markdown" split
+    # across deltas is still stripped once the rest of it arrives.
+    hold = len("markdown") - 1
+    parts = []
+    pending = ""
     for chunk in stream:
-        response += chunk.choices[0].delta.content or ''
-        response = response.replace("```","").replace("markdown", "")
-        print(response, end="")
+        pending += chunk.choices[0].delta.content or ''
+        pending = pending.replace("```","").replace("markdown", "")
+        ready, pending = pending[:-hold], pending[-hold:]
+        parts.append(ready)
+        print(ready, end="")
+    parts.append(pending)
+    print(pending, end="")
+    return "".join(parts)
 
 get_streamed_brochure("IBM", "https://www.ibm.com")
\ No newline at end of file
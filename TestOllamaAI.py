@@ -1,17 +1,18 @@
 
+import asyncio
 import os
-import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from IPython.display import display, Markdown
 import ollama
 
 load_dotenv(override=True)
+
+from providers.async_client import AsyncLLM
+
 # Initialize Ollama client
 
-api_base = "http://localhost:11434/api/chat"
-api_version = "v1"
-headers = {"Content-Type": "application/json"}
+llm = AsyncLLM()
 models = "llama3.2"
 
 message = "Hello, Llama! What is the capital of Nigeria?"
@@ -21,9 +22,10 @@ response = ollama.chat(model= models, messages=[{"role": "user", "content": mess
 print("\n" + response["message"]["content"])
 
 message = "Hello, Llama! Describe the process of photosynthesis."
-payload = {    "model": models,
-    "messages": [{"role": "user", "content": message}],
-    "stream": False}
-response = requests.post(f"{api_base}", headers=headers, json=payload)
-print(Markdown(response.json()["message"]["content"]).data)
 
+
+async def ask(question: str) -> str:
+    return "".join([token async for token in llm.stream(models, [{"role": "user", "content": question}])])
+
+response = asyncio.run(ask(message))
+print(Markdown(response).data)
@@ -3,22 +3,20 @@ import os
 import gradio as gr
 from dotenv import load_dotenv
 
+# Load environment variables before the project modules read their settings
+load_dotenv()
+
+from cache import format_cache_stats
 from constants import TAB_JOB_MATCH, TAB_NAMES, TAB_SMART_CV, TAB_STUDY_NOTES
 from tabs.generic_tab import build_generic_tab
 from tabs.job_match_tab import build_job_match_tab
 from tabs.smart_cv.app import build_ui
 from tabs.study_notes_tab import build_study_notes_tab
 
-# Load environment variables
-load_dotenv()
-
 with gr.Blocks(
+    analytics_enabled=False,
     css="#job-match-result { border: 1px solid #e0e0e0; padding: 1rem; border-radius: 0.5rem; }"
 ) as demo:
-    selectedModel = "Open AI"
-    systemMessage = "You are a useful AI utility buddy."
-    contextModelchanged = True
-
     with gr.Row():
         gr.Markdown(
             """
@@ -27,6 +25,12 @@ with gr.Blocks(
         """
         )
 
+    with gr.Sidebar(open=False):
+        gr.Markdown("### Response Cache")
+        cache_stats_md = gr.Markdown(format_cache_stats())
+        refresh_stats = gr.Button("Refresh", size="sm")
+        refresh_stats.click(format_cache_stats, None, cache_stats_md, queue=False, show_progress="hidden")
+
     with gr.Row():
         tabs_header = gr.Tabs()
 
@@ -50,6 +54,13 @@ if __name__ == "__main__":
     server_name = os.getenv("GRADIO_SERVER_NAME", "0.0.0.0")
     server_port = int(os.getenv("PORT", "7860"))
 
+    # Handlers are async and mostly wait on the LLM, so let many streams run at once
+    demo.queue(
+        default_concurrency_limit=int(os.getenv("GRADIO_CONCURRENCY", "16")),
+        max_size=64,
+        api_open=False,
+    )
+
     # Launch with production-ready settings
     demo.launch(
         server_name=server_name,
@@ -0,0 +1,313 @@
+"""
+Response caching for LLM calls.
+
+Two layers sit in front of the provider. An exact-match cache keyed by the
+SHA-256 of the canonical request JSON catches byte-identical reruns in
+microseconds; behind it, a semantic cache embeds only the short user query
+with a small sentence-transformer and returns a stored completion when a
+previous query is close enough. Semantic matches are confined to a scope, an
+exact hash of the model and everything else in the request (system prompt,
+earlier turns, attached context), so a similar question is only ever
+answered from a conversation that was otherwise identical.
+"""
+import asyncio
+import atexit
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_FILE = Path(".semantic_cache.pkl")
+
+# Exact-match cache: prompt hash -> completed response text, most recently used last
+exact_cache = OrderedDict()
+EXACT_CACHE_SIZE = int(os.getenv("EXACT_CACHE_SIZE", "512"))
+# In-flight requests: prompt hash -> state shared with callers waiting on it
+inflight = {}
+_FLIGHT_DONE = object()
+# Sent when the leading caller goes away before its stream finishes
+_FLIGHT_ABANDONED = object()
+cache_stats = {"hits": 0, "semantic_hits": 0, "misses": 0}
+
+
+def prompt_key(model: str, messages: list, temperature: float = None, tools: list = None):
+    """
+    Hash a request for the exact-match cache.
+
+    Only deterministic requests (temperature unset or 0) are cacheable, since
+    sampling at a higher temperature is expected to vary between calls.
+
+    Returns:
+        Hex SHA-256 digest of the canonical request JSON, or None if the
+        request should not be cached
+    """
+    if temperature not in (None, 0):
+        return None
+    payload = orjson.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "tools": tools or []},
+        option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def semantic_scope(model: str, messages: list, context=None) -> str:
+    """
+    Hash everything except the semantic query for the semantic cache.
+
+    Args:
+        model: Model name
+        messages: Messages sent ahead of the query (system prompt, earlier turns)
+        context: Any other request data the answer depends on (e.g. notes)
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON
+    """
+    payload = orjson.dumps({"model": model, "messages": messages, "context": context},
+                           option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def format_cache_stats() -> str:
+    """Render the cache counters as Markdown."""
+    total = sum(cache_stats.values())
+    hit_rate = (cache_stats["hits"] + cache_stats["semantic_hits"]) / total if total else 0.0
+    return (
+        f"**Exact hits:** {cache_stats['hits']}  \n"
+        f"**Semantic hits:** {cache_stats['semantic_hits']}  \n"
+        f"**Misses:** {cache_stats['misses']}  \n"
+        f"**Hit rate:** {hit_rate:.0%}"
+    )
+
+
+class SemanticCache:
+    """In-memory HNSW index of (query embedding, scope, response) entries."""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", dim: int = 384,
+                 threshold: float = 0.92, path: Path = SEMANTIC_CACHE_FILE,
+                 max_elements: int = 10_000):
+        self.model_name = model_name
+        self.dim = dim
+        self.threshold = threshold
+        self.path = path
+        self.max_elements = max_elements
+        self._model = None
+        self._index = None
+        self._embeddings = []
+        self._scopes = []
+        self._responses = []
+        # Entries per scope, so a lookup in an empty scope skips the embedding
+        self._scope_counts = {}
+        self._disabled = False
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self) -> bool:
+        """Load the embedding model and index on first use."""
+        if self._index is not None:
+            return True
+        if self._disabled:
+            return False
+        try:
+            import hnswlib
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            logger.info(
+                "Semantic cache disabled: sentence-transformers/hnswlib not installed")
+            self._disabled = True
+            return False
+
+        try:
+            self._model = SentenceTransformer(self.model_name)
+        except Exception as e:
+            # Typically no network to download the model; don't retry on every request
+            logger.warning(f"Semantic cache disabled: could not load {self.model_name}: {e}")
+            self._disabled = True
+            return False
+        self._index = hnswlib.Index(space="cosine", dim=self.dim)
+        self._index.init_index(max_elements=self.max_elements)
+        # Searches are filtered by scope, so look at more candidates than the default
+        self._index.set_ef(64)
+        self._load()
+        return True
+
+    def _encode(self, text: str):
+        return self._model.encode(text, normalize_embeddings=True)
+
+    def lookup(self, text: str, scope: str):
+        """Return the cached response for a similar query in the same scope, or None."""
+        with self._lock:
+            if not self._ensure_loaded() or not self._scope_counts.get(scope):
+                return None
+            try:
+                labels, distances = self._index.knn_query(
+                    self._encode(text), k=1, filter=lambda label: self._scopes[label] == scope)
+            except RuntimeError:  # no candidate in the scope was reached
+                return None
+            if distances[0][0] < 1 - self.threshold:
+                return self._responses[labels[0][0]]
+        return None
+
+    def store(self, text: str, scope: str, response: str):
+        """Add a completed response to the index."""
+        if not response:
+            return
+        with self._lock:
+            if not self._ensure_loaded() or len(self._responses) >= self.max_elements:
+                return
+            key = self._encode(text)
+            new_id = len(self._responses)
+            self._index.add_items(key, new_id)
+            self._embeddings.append(key)
+            self._scopes.append(scope)
+            self._responses.append(response)
+            self._scope_counts[scope] = self._scope_counts.get(scope, 0) + 1
+
+    def save(self):
+        """Persist the cached pairs to disk."""
+        if not self._responses:
+            return
+        try:
+            with open(self.path, "wb") as f:
+                pickle.dump({"model": self.model_name, "embeddings": self._embeddings,
+                             "scopes": self._scopes, "responses": self._responses}, f)
+        except Exception as e:
+            logger.warning(f"Could not save semantic cache: {e}")
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            import numpy as np
+
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+            # Files written before scoping can't be matched safely; start over
+            if data.get("model") != self.model_name or "scopes" not in data or not data["responses"]:
+                return
+            embeddings = data["embeddings"][:self.max_elements]
+            self._index.add_items(np.asarray(embeddings), list(range(len(embeddings))))
+            self._embeddings = list(embeddings)
+            self._scopes = data["scopes"][:len(embeddings)]
+            self._responses = data["responses"][:len(embeddings)]
+            for scope in self._scopes:
+                self._scope_counts[scope] = self._scope_counts.get(scope, 0) + 1
+        except Exception as e:
+            logger.warning(f"Could not load semantic cache: {e}")
+
+
+semantic_cache = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")))
+atexit.register(semantic_cache.save)
+
+
+async def cached_stream(query: str, stream, exact_key: str = None, scope: str = None):
+    """
+    Serve a streaming completion through the exact-match and semantic caches.
+
+    Args:
+        query: Short user input to look up similar cached responses by, or
+            None to skip the semantic layer
+        stream: Async generator yielding the cumulative response text. It is
+            only iterated on a cache miss, so no API call is made on a hit.
+        exact_key: Hash from prompt_key(), or None to skip the exact layer
+        scope: Hash from semantic_scope(); semantic hits must share it
+
+    Yields:
+        The cumulative response text
+    """
+    if exact_key is not None and exact_key in exact_cache:
+        cache_stats["hits"] += 1
+        exact_cache.move_to_end(exact_key)
+        yield exact_cache[exact_key]
+        return
+
+    use_semantic = query is not None and scope is not None
+    if use_semantic:
+        # Embedding is CPU-bound, keep it off the event loop
+        cached = await asyncio.to_thread(semantic_cache.lookup, query, scope)
+        if cached is not None:
+            cache_stats["semantic_hits"] += 1
+            yield cached
+            return
+
+    cache_stats["misses"] += 1
+    result = ""
+    try:
+        async for result in stream:
+            yield result
+    finally:
+        # Close the upstream now if our caller went away, not whenever it is collected
+        await stream.aclose()
+    if exact_key is not None and result:
+        exact_cache[exact_key] = result
+        exact_cache.move_to_end(exact_key)
+        if len(exact_cache) > EXACT_CACHE_SIZE:
+            exact_cache.popitem(last=False)
+    if use_semantic:
+        await asyncio.to_thread(semantic_cache.store, query, scope, result)
+
+
+async def singleflight_stream(key: str, stream):
+    """
+    Coalesce concurrent identical requests onto one upstream stream.
+
+    The first caller for a key runs the stream and broadcasts every result;
+    callers arriving while it is in flight subscribe to that broadcast instead
+    of starting their own request. If the first caller disconnects before the
+    stream finishes, its subscribers fall back to their own stream (the first
+    of them leading again), so none of them takes a truncated answer as final.
+
+    Args:
+        key: Hash from prompt_key(), or None to always run the stream
+        stream: Async generator yielding the cumulative response text
+
+    Yields:
+        The cumulative response text
+    """
+    if key is None:
+        async for result in stream:
+            yield result
+        return
+
+    # No await between the lookup and the insert, so this is atomic on the loop
+    flight = inflight.get(key)
+    if flight is not None:
+        queue = asyncio.Queue()
+        flight["subscribers"].append(queue)
+        # Results are cumulative, so the latest one catches a late subscriber up
+        if flight["latest"] is not None:
+            queue.put_nowait(flight["latest"])
+        while (item := await queue.get()) is not _FLIGHT_DONE:
+            if item is _FLIGHT_ABANDONED:
+                async for result in singleflight_stream(key, stream):
+                    yield result
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        return
+
+    flight = {"subscribers": [], "latest": None}
+    inflight[key] = flight
+    # Stays abandoned unless the stream completes or fails (closed/cancelled caller)
+    outcome = _FLIGHT_ABANDONED
+    try:
+        async for result in stream:
+            flight["latest"] = result
+            for queue in flight["subscribers"]:
+                queue.put_nowait(result)
+            yield result
+        outcome = _FLIGHT_DONE
+    except Exception as e:
+        outcome = e
+        raise
+    finally:
+        inflight.pop(key, None)
+        for queue in flight["subscribers"]:
+            queue.put_nowait(outcome)
+        await stream.aclose()
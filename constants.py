@@ -24,6 +24,9 @@ default_tab_titles = {
 }
 
 # Create a mapping for nicer default system prompts per tab (can be customized later)
+# Keep these strings fixed: they are sent as the leading system message, and
+# OpenAI/Anthropic prompt caching only reuses a prefix that is byte-identical
+# across calls. Put per-request data (timestamps, user input) in the user turn.
 default_system_prompts = {
     TAB_RECIPE: """You are Zeno, a friendly virtual chef assistant. You only provide structured recipe recommendations and do not answer questions unrelated to recipes. If asked anything else, politely decline and redirect to recipe help.
 
@@ -0,0 +1 @@
+# Shared LLM provider clients
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""
+Async streaming client shared by every LLM provider.
+
+One AsyncLLM instance drives OpenAI, Anthropic, Gemini and a local Ollama
+server from Gradio's event loop, so concurrent tab handlers no longer hold a
+worker thread each while they wait on tokens. Every provider gets a single
+pooled HTTP client, created on first use and kept alive, so repeated calls
+reuse warm connections instead of paying a TCP/TLS handshake per request.
+"""
+import asyncio
+import email.utils
+import os
+import sys
+import time
+from typing import AsyncIterator
+
+import httpx
+import orjson
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+from providers.clients import HTTP2_AVAILABLE
+from providers.config import LLM_TIMEOUT
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+
+PROVIDER_OPENAI = "openai"
+PROVIDER_ANTHROPIC = "anthropic"
+PROVIDER_GEMINI = "gemini"
+PROVIDER_OLLAMA = "ollama"
+
+_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=64)
+_TIMEOUT = httpx.Timeout(60, connect=5)
+
+# Failures worth another attempt: the request never got a (timely) answer
+_RETRYABLE = (asyncio.TimeoutError, httpx.TimeoutException, httpx.ConnectError)
+_MAX_ATTEMPTS = 3
+# Longest Retry-After honoured before a retry; the user is waiting on the answer
+_MAX_RETRY_AFTER = 30
+_backoff = wait_exponential_jitter(initial=0.5, max=4)
+
+# Minimum time between UI updates while streaming
+STREAM_FLUSH_MS = int(os.getenv("STREAM_FLUSH_MS", "50"))
+
+
+def provider_for(model: str) -> str:
+    """Pick the provider that serves a model name; unknown names go to Ollama."""
+    if model.startswith("claude"):
+        return PROVIDER_ANTHROPIC
+    if model.startswith("gemini"):
+        return PROVIDER_GEMINI
+    if model.startswith(("gpt", "o1", "o3", "o4")):
+        return PROVIDER_OPENAI
+    return PROVIDER_OLLAMA
+
+
+def _is_retryable_status(status: int) -> bool:
+    """Rate limits and server errors; the SDKs retried these before max_retries=0."""
+    return status == 429 or status >= 500
+
+
+def _is_retryable(error: BaseException) -> bool:
+    if isinstance(error, _RETRYABLE):
+        return True
+    # SDKs are imported lazily, so only check the ones already loaded
+    for module in ("openai", "anthropic"):
+        sdk = sys.modules.get(module)
+        if sdk is None:
+            continue
+        if isinstance(error, sdk.APIConnectionError):
+            return True
+        if isinstance(error, sdk.APIStatusError):
+            return _is_retryable_status(error.status_code)
+    # Ollama's raise_for_status()
+    if isinstance(error, httpx.HTTPStatusError):
+        return _is_retryable_status(error.response.status_code)
+    return False
+
+
+def _retry_after(error: BaseException):
+    """Seconds the server asked us to wait, from a Retry-After header, or None."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_wait(retry_state) -> float:
+    """Honour Retry-After when the server sends one, else jittered backoff."""
+    delay = _retry_after(retry_state.outcome.exception())
+    if delay is not None:
+        return min(delay, _MAX_RETRY_AFTER)
+    return _backoff(retry_state)
+
+
+def _split_system(messages: list):
+    """Separate system prompts from the chat turns, keeping only role/content."""
+    system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+    chat = [{"role": m["role"], "content": m["content"]}
+            for m in messages if m["role"] != "system"]
+    return system, chat
+
+
+async def batch_stream(tokens: AsyncIterator[str], flush_ms: int = STREAM_FLUSH_MS) -> AsyncIterator[str]:
+    """
+    Turn a token stream into cumulative text, yielding at most every flush_ms.
+
+    Each yield makes Gradio diff and repaint the output component, so
+    re-rendering per token slows long responses down badly. Tokens arriving
+    inside one interval are emitted together; the final text is always yielded.
+    """
+    interval = flush_ms / 1000
+    # Collect deltas in a list and join once per flush, not once per token
+    parts = []
+    pending = False
+    last = time.monotonic()
+    async for token in tokens:
+        parts.append(token)
+        pending = True
+        now = time.monotonic()
+        if now - last >= interval:
+            last = now
+            pending = False
+            yield "".join(parts)
+    if pending:
+        yield "".join(parts)
+
+
+class AsyncLLM:
+    """Provider-agnostic streaming chat completions."""
+
+    def __init__(self):
+        self._clients = {}
+        self._gemini_configured = False
+
+    def _client(self, provider: str):
+        client = self._clients.get(provider)
+        if client is not None:
+            return client
+
+        if provider == PROVIDER_OLLAMA:
+            client = httpx.AsyncClient(base_url=OLLAMA_URL, limits=_POOL_LIMITS, timeout=_TIMEOUT)
+        elif provider == PROVIDER_OPENAI:
+            # HTTP/2 lets concurrent streams share one TLS connection per provider;
+            # Ollama stays on HTTP/1.1 since localhost has no handshake to save
+            http_client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=_POOL_LIMITS, timeout=_TIMEOUT)
+            # SDKs are imported on first use; each costs hundreds of ms at startup
+            from openai import AsyncOpenAI
+
+            client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"),
+                                 http_client=http_client, max_retries=0)
+        else:
+            import anthropic
+
+            # Newer SDK releases run on httpx2 and reject httpx clients and
+            # timeouts, so Anthropic keeps its own pool with a plain timeout
+            client = anthropic.AsyncAnthropic(
+                api_key=os.getenv("ANTHROPIC_API_KEY"), timeout=_TIMEOUT.read, max_retries=0)
+        self._clients[provider] = client
+        return client
+
+    async def stream(self, model: str, messages: list, timeout: float = LLM_TIMEOUT,
+                     **kw) -> AsyncIterator[str]:
+        """
+        Stream a chat completion as text deltas.
+
+        Connection failures, timeouts, rate limits and server errors before
+        the first token are retried with jittered exponential backoff (or
+        after the server's Retry-After); once tokens have been yielded a
+        stall is raised instead, since a retry would repeat text.
+
+        Args:
+            model: Model name; the provider is inferred from it
+            messages: OpenAI-style list of {"role", "content"} dicts
+            timeout: Seconds to wait for the first token and between tokens
+            **kw: Sampling options (temperature, max_tokens, top_p)
+
+        Yields:
+            Text deltas in arrival order
+        """
+        async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(_MAX_ATTEMPTS),
+                wait=_retry_wait,
+                retry=retry_if_exception(_is_retryable),
+                reraise=True):
+            with attempt:
+                tokens = self._provider_stream(model, messages, **kw)
+                try:
+                    first = await asyncio.wait_for(anext(tokens), timeout)
+                except StopAsyncIteration:
+                    return
+                except BaseException:
+                    await tokens.aclose()
+                    raise
+
+        try:
+            yield first
+            while True:
+                try:
+                    token = await asyncio.wait_for(anext(tokens), timeout)
+                except StopAsyncIteration:
+                    return
+                yield token
+        finally:
+            await tokens.aclose()
+
+    def _provider_stream(self, model: str, messages: list, **kw):
+        provider = provider_for(model)
+        if provider == PROVIDER_ANTHROPIC:
+            return self._claude_stream(model, messages, **kw)
+        if provider == PROVIDER_GEMINI:
+            return self._gemini_stream(model, messages, **kw)
+        if provider == PROVIDER_OPENAI:
+            return self._openai_stream(model, messages, **kw)
+        return self._ollama_stream(model, messages, **kw)
+
+    async def _openai_stream(self, model: str, messages: list, **kw):
+        chat = [{"role": m["role"], "content": m["content"]} for m in messages]
+        response = await self._client(PROVIDER_OPENAI).chat.completions.create(
+            model=model, messages=chat, stream=True, **kw)
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def _claude_stream(self, model: str, messages: list, max_tokens: int = 1024, **kw):
+        system, chat = _split_system(messages)
+        if system:
+            # Mark the fixed system prompt as a cacheable prefix
+            kw["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        async with self._client(PROVIDER_ANTHROPIC).messages.stream(
+                model=model, max_tokens=max_tokens, messages=chat, **kw) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    async def _gemini_stream(self, model: str, messages: list, max_tokens: int = None, **kw):
+        import google.generativeai as genai
+
+        if not self._gemini_configured:
+            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+            self._gemini_configured = True
+        system, chat = _split_system(messages)
+        gemini = genai.GenerativeModel(model_name=model, system_instruction=system or None)
+        contents = [{"role": "model" if m["role"] == "assistant" else "user", "parts": [m["content"]]}
+                    for m in chat]
+        if max_tokens:
+            kw["max_output_tokens"] = max_tokens
+        response = await gemini.generate_content_async(
+            contents, generation_config=kw or None, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    async def _ollama_stream(self, model: str, messages: list, max_tokens: int = None, **kw):
+        if max_tokens:
+            kw["num_predict"] = max_tokens
+        chat = [{"role": m["role"], "content": m["content"]} for m in messages]
+        payload = {"model": model, "messages": chat, "stream": True}
+        if kw:
+            payload["options"] = kw
+        async with self._client(PROVIDER_OLLAMA).stream(
+                "POST", "/api/chat", content=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = orjson.loads(line)
+                token = data.get("message", {}).get("content")
+                if token:
+                    yield token
+                if data.get("done"):
+                    break
+
+    async def aclose(self):
+        """Close every pooled connection."""
+        for client in self._clients.values():
+            if isinstance(client, httpx.AsyncClient):
+                await client.aclose()
+            else:
+                await client.close()
+        self._clients.clear()
@@ -0,0 +1,44 @@
+"""
+Synchronous provider clients, built once per process.
+
+Scripts and the Smart CV tab make blocking calls; they import these
+singletons instead of constructing a new SDK client per call, so every
+request reuses the same keep-alive (and, with h2 installed, HTTP/2)
+connections rather than paying a fresh TCP/TLS handshake.
+"""
+import atexit
+import importlib.util
+import os
+from functools import lru_cache
+
+import httpx
+
+# httpx needs the h2 package (httpx[http2]) to negotiate HTTP/2
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# No timeout here: the SDKs inherit an injected client's timeout, so each
+# passes its own default (10 min read) for long non-streaming generations
+http_client = httpx.Client(
+    http2=HTTP2_AVAILABLE,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+)
+atexit.register(http_client.close)
+
+
+@lru_cache(maxsize=None)
+def openai_client(api_key: str = None):
+    """Return the shared OpenAI client for an API key (default: OPENAI_API_KEY)."""
+    import openai
+
+    return openai.OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"),
+                         http_client=http_client, timeout=openai.DEFAULT_TIMEOUT)
+
+
+@lru_cache(maxsize=None)
+def anthropic_client(api_key: str = None):
+    """Return the shared Anthropic client for an API key (default: ANTHROPIC_API_KEY)."""
+    import anthropic
+
+    # Newer SDK releases run on httpx2 and reject an httpx client, so this one
+    # keeps the SDK's own pooled client (still one per process)
+    return anthropic.Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
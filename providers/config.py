@@ -0,0 +1,30 @@
+"""
+Per-call completion settings shared by the tabs.
+"""
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "15"))
+
+
+@dataclass(frozen=True)
+class CompletionConfig:
+    """Model and request options for one streamed completion."""
+    model: str = "gpt-4o-mini"
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    # Seconds to wait for the first token, and between tokens, before retrying
+    request_timeout: float = LLM_TIMEOUT
+
+    def sampling_options(self) -> dict:
+        """Options to pass through to AsyncLLM.stream()."""
+        options = {}
+        if self.temperature is not None:
+            options["temperature"] = self.temperature
+        if self.max_tokens is not None:
+            options["max_tokens"] = self.max_tokens
+        return options
+
+
+DEFAULT_COMPLETION = CompletionConfig()
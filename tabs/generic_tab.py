@@ -25,21 +25,21 @@ def build_generic_tab(tab_id: str):
             updated_history = history + [{"role": "user", "content": message}]
             return "", updated_history
 
-        def get_response(history: list):
+        async def get_response(history: list):
             """Get AI response with system prompt"""
             if not history:
-                return history
+                return
 
             # Build messages with system prompt
             messages = [{"role": "system", "content": system_prompt}] + history
 
             # Stream response
-            for ai_history in responseStream(messages):
+            async for ai_history in responseStream(messages):
                 # Combine history with AI response
                 yield history + [ai_history[-1]]
 
-        msg.submit(handle_message, [msg, chatbot], [msg, chatbot], queue=False).then(
+        msg.submit(handle_message, [msg, chatbot], [msg, chatbot], queue=False, show_progress="hidden").then(
             get_response, chatbot, chatbot
         )
-        clear.click(lambda: None, None, chatbot, queue=False)
+        clear.click(lambda: None, None, chatbot, queue=False, show_progress="hidden")
         return {"chatbot": chatbot, "msg": msg, "clear": clear}
@@ -1,15 +1,85 @@
+import asyncio
+import hashlib
+import os
+import re
+import threading
 import gradio as gr
-from PyPDF2 import PdfReader
-import requests
-from bs4 import BeautifulSoup
+import httpx
+from cachetools import LRUCache, TTLCache
+from selectolax.lexbor import LexborHTMLParser
 import logging
 
-from utils import onSystemPromptChanged, responseStream, openai
+from utils import onSystemPromptChanged, streamAIResponse
 from constants import TAB_JOB_MATCH, default_system_prompts, default_tab_titles
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+_SYSTEM_PROMPT = default_system_prompts.get(TAB_JOB_MATCH, "You are a job match assistant")
+
+# Fixed match prompt template; filled with the job description and resume
+_MATCH_PROMPT_TMPL = (
+    "Please analyze the following job description and candidate profile. "
+    "Strip out and ignore other information in the job description content that are not relevant. "
+    "Provide: 1) Match score (0-100) 2) Key matching skills 3) Gaps and suggestions 4) Missing keywords that should be included in the resume 5) A brief tailored summary."
+    "\n\nJob Description:\n%s\n\nCandidate Profile:\n%s"
+)
+# Longest job description passed to the model, in characters
+MAX_JD_CHARS = 8000
+# Section headings that mark the body of a posting on an otherwise noisy page.
+# Anchored to line starts: words like "experience" also appear in cookie banners.
+_JOB_SECTION_RE = re.compile(
+    r"^\s*(responsibilities|requirements|qualifications|about the role)\b", re.I | re.M)
+# Characters kept ahead of the first job-section match (title, company, role summary)
+_JD_LEAD_CHARS = 600
+
+# Visibility updates for each radio choice, built once
+_TOGGLE_JOB_INPUT = {
+    "Job URL": (gr.update(visible=True), gr.update(visible=False)),
+    "Paste Description": (gr.update(visible=False), gr.update(visible=True)),
+}
+_TOGGLE_RESUME_INPUT = {
+    "Paste Resume": (gr.update(visible=True), gr.update(visible=False)),
+    "Upload PDF": (gr.update(visible=False), gr.update(visible=True)),
+}
+
+# Parsed resume text by file fingerprint; least recently used entries are evicted
+PDF_CACHE_SIZE = 32
+_pdf_text_cache = LRUCache(maxsize=PDF_CACHE_SIZE)
+# Resumes are parsed via asyncio.to_thread, so concurrent matches share this cache
+_pdf_text_lock = threading.Lock()
+# Trimmed job page text by URL; bounded, and entries expire after JOB_PAGE_TTL seconds
+JOB_PAGE_TTL = 300
+_job_page_cache = TTLCache(maxsize=128, ttl=JOB_PAGE_TTL)
+# (job text, ETag, Last-Modified) by URL, kept past the TTL to revalidate expired pages
+_job_page_validators = LRUCache(maxsize=128)
+# Largest job page body read before parsing; the rest is ignored
+MAX_PAGE_BYTES = 4_000_000
+# Matches run at once; each one parses a PDF and a page in worker threads
+MATCH_CONCURRENCY = 4
+
+
+class JobInputError(Exception):
+    """A job page or resume could not be loaded; the message is shown to the user."""
+
+
+# Shared client for job page fetches; follows redirects like requests did.
+# Conditional requests are sent by hand in extract_job_description_from_url_with_ai:
+# an HTTP cache layer would read whole bodies before the MAX_PAGE_BYTES and
+# Content-Type checks.
+_http_client = httpx.AsyncClient(
+    follow_redirects=True,
+    timeout=httpx.Timeout(10, connect=3.05),
+    # Many job boards refuse the default python-httpx user agent
+    headers={
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept-Language": "en-US,en;q=0.9",
+    },
+    # Retry connection failures; httpx transports never retry after a response
+    transport=httpx.AsyncHTTPTransport(retries=2),
+)
+
 
 def build_job_match_tab():
     with gr.Column():
@@ -42,39 +112,134 @@ def build_job_match_tab():
                                 elem_id="job-match-result")
 
         def build_match_prompt(jd: str, cv: str):
-            jd = jd or ""
-            cv = cv or ""
-            return (
-                "Please analyze the following job description and candidate profile. "
-                "Strip out and ignore other information in the job description content that are not relevant. "
-                f"Provide: 1) Match score (0-100) 2) Key matching skills 3) Gaps and suggestions 4) Missing keywords that should be included in the resume 5) A brief tailored summary."
-                f"\n\nJob Description:\n{jd}\n\nCandidate Profile:\n{cv}"
-            )
+            jd = (jd or "")[:MAX_JD_CHARS]
+            return _MATCH_PROMPT_TMPL % (jd, cv or "")
+
+        def file_fingerprint(path: str):
+            """Hash the size plus first and last 64 KB; enough to tell uploads apart."""
+            size = os.path.getsize(path)
+            digest = hashlib.blake2b(str(size).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read(65536))
+                if size > 65536:
+                    f.seek(max(size - 65536, 65536))
+                    digest.update(f.read())
+            return digest.hexdigest()
 
         def extract_text_from_pdf(pdf_file):
+            # Gradio stores each upload under a new temp path, so key on content
             try:
-                reader = PdfReader(pdf_file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text()
-                return text
+                key = file_fingerprint(pdf_file)
+            except OSError as e:
+                raise JobInputError(f"Error reading PDF: {e}") from e
+            with _pdf_text_lock:
+                if key in _pdf_text_cache:
+                    return _pdf_text_cache[key]
+
+            try:
+                # Only needed for uploads, so keep it off the startup path
+                import pypdfium2 as pdfium
+
+                pdf = pdfium.PdfDocument(pdf_file)
+                try:
+                    # PDFium is not thread-safe, so pages are read in order
+                    text = "\n".join(page.get_textpage().get_text_range() for page in pdf)
+                finally:
+                    pdf.close()
             except Exception as e:
-                return f"Error reading PDF: {e}"
+                raise JobInputError(f"Error reading PDF: {e}") from e
+
+            with _pdf_text_lock:
+                _pdf_text_cache[key] = text
+            return text
 
-        def extract_job_description_from_url_with_ai(url):
+        def extract_page_text(html: str):
             try:
-                response = requests.get(url)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                # Extract all text from the page
-                page_content = soup.get_text(separator="\n", strip=True)
-                return page_content
+                # Imported on first fetch; it pulls in lxml, which startup doesn't need
+                import trafilatura
+            except ImportError:  # Boilerplate removal is optional; selectolax is the fallback
+                text = None
+            else:
+                # Main-content extraction drops menus, ads and related listings
+                text = trafilatura.extract(html, include_comments=False, include_tables=False)
+            if text:
+                return text
+
+            tree = LexborHTMLParser(html)
+            # Drop page chrome so only the posting itself reaches the prompt
+            for tag in tree.css("script, style, nav, footer, header, aside"):
+                tag.decompose()
+            root = tree.body or tree.root
+            return root.text(separator="\n", strip=True) if root else ""
+
+        def trim_job_text(text: str):
+            """Cut a long page down to the window around the posting itself."""
+            if len(text) <= MAX_JD_CHARS:
+                return text
+            match = _JOB_SECTION_RE.search(text)
+            start = 0
+            if match:
+                # Back up to a line boundary so the title/summary above is kept
+                start = text.rfind("\n", 0, max(0, match.start() - _JD_LEAD_CHARS)) + 1
+            return text[start:start + MAX_JD_CHARS]
+
+        async def extract_job_description_from_url_with_ai(url):
+            cached = _job_page_cache.get(url)
+            if cached is not None:
+                return cached
+            # Expired pages are revalidated so an unchanged posting isn't downloaded again
+            stale = _job_page_validators.get(url)
+            headers = {}
+            if stale is not None:
+                _, etag, last_modified = stale
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+            try:
+                async with _http_client.stream("GET", url, headers=headers) as response:
+                    if response.status_code == 304 and stale is not None:
+                        _job_page_cache[url] = stale[0]
+                        return stale[0]
+                    response.raise_for_status()
+                    content_type = response.headers.get("Content-Type", "")
+                    if "html" not in content_type:
+                        raise JobInputError(
+                            f"Error fetching job description: expected an HTML page, got {content_type or 'unknown content type'}")
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes(65536):
+                        body.extend(chunk)
+                        if len(body) >= MAX_PAGE_BYTES:
+                            break
+                    html = body[:MAX_PAGE_BYTES].decode(
+                        response.charset_encoding or "utf-8", errors="replace")
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                page_text = await asyncio.to_thread(extract_page_text, html)
+            except JobInputError:
+                raise
             except Exception as e:
-                return f"Error fetching job description: {e}"
+                raise JobInputError(f"Error fetching job description: {e}") from e
+            job_text = trim_job_text(page_text)
+            _job_page_cache[url] = job_text
+            if etag or last_modified:
+                _job_page_validators[url] = (job_text, etag, last_modified)
+            else:
+                _job_page_validators.pop(url, None)
+            return job_text
+
+        async def fetch_job_description(job_input_method: str, url: str, job_text: str):
+            if job_input_method == "Job URL":
+                return await extract_job_description_from_url_with_ai(url)
+            return job_text or ""  # "Paste Description"
+
+        async def load_resume(resume_input_type: str, resume_content, resume_file):
+            if resume_input_type == "Upload PDF" and resume_file is not None:
+                return await asyncio.to_thread(extract_text_from_pdf, resume_file.name)
+            return resume_content or ""
 
-        def on_match(job_input_method: str, url: str, job_text: str, resume_input_type: str, resume_content, resume_file, history: list):
-            system_prompt = default_system_prompts.get(
-                TAB_JOB_MATCH, "You are a job match assistant")
+        async def on_match(job_input_method: str, url: str, job_text: str, resume_input_type: str, resume_content, resume_file, history: list):
+            system_prompt = _SYSTEM_PROMPT
             onSystemPromptChanged(system_prompt)
 
             # Initialize history if None
@@ -82,18 +247,17 @@ def build_job_match_tab():
                 history = []
 
             try:
-                # Get job description based on input method
-                if job_input_method == "Job URL":
-                    jd = extract_job_description_from_url_with_ai(url)
-                else:  # "Paste Description"
-                    jd = job_text or ""
-
-                if resume_input_type == "Upload PDF" and resume_file is not None:
-                    cv = extract_text_from_pdf(resume_file.name)
-                else:
-                    cv = resume_content or ""
-
-                prompt = build_match_prompt(jd, cv)
+                # Fetch the job page and parse the resume concurrently; a failure
+                # in one shouldn't hide the other's result
+                results = await asyncio.gather(
+                    fetch_job_description(job_input_method, url, job_text),
+                    load_resume(resume_input_type, resume_content, resume_file),
+                    return_exceptions=True)
+                input_error = next((r for r in results if isinstance(r, BaseException)), None)
+                if input_error is not None and not isinstance(input_error, JobInputError):
+                    # Unexpected failures go to the generic handler below
+                    raise input_error
+                jd, cv = ("" if isinstance(r, BaseException) else r.strip() for r in results)
 
                 # Add user message to history with context
                 job_summary = f"Job from URL: {url}" if job_input_method == "Job URL" else "Pasted job description"
@@ -102,17 +266,29 @@ def build_job_match_tab():
                     [{"role": "user", "content": f"Analyze job match for {job_summary} and {resume_summary}."}]
                 yield updated_history
 
+                # Don't spend an LLM call on a missing input or a failed fetch/parse
+                if input_error is not None or not jd or not cv:
+                    problem = str(input_error) if input_error else "Both a job description and a resume are needed."
+                    yield updated_history + [{
+                        "role": "assistant",
+                        "content": f"⚠️ {problem}\n\nPlease check your inputs and try again."
+                    }]
+                    return
+
+                prompt = build_match_prompt(jd, cv)
+
                 # Build messages for AI with system prompt and full context
                 messages = [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": prompt}
                 ]
 
-                # Stream AI response and update history with error handling
+                # Stream AI response and update history with error handling.
+                # Exact matches only: a similar prompt may hold another candidate's resume.
                 try:
-                    for ai_history in responseStream(messages):
+                    async for response in streamAIResponse(messages, semantic=False):
                         # Combine display history with AI response
-                        yield updated_history + [ai_history[-1]]
+                        yield updated_history + [{"role": "assistant", "content": response}]
                 except Exception as stream_error:
                     # Log the streaming error
                     logger.error(
@@ -144,19 +320,21 @@ def build_job_match_tab():
                 return
 
         def toggle_job_input(input_method):
-            return gr.update(visible=(input_method == "Job URL")), gr.update(visible=(input_method == "Paste Description"))
+            return _TOGGLE_JOB_INPUT[input_method]
 
         def toggle_resume_input(input_type):
-            return gr.update(visible=(input_type == "Paste Resume")), gr.update(visible=(input_type == "Upload PDF"))
+            return _TOGGLE_RESUME_INPUT[input_type]
 
         job_input_type.change(toggle_job_input, inputs=[job_input_type], outputs=[
-                              job_desc_url, job_desc_text])
+                              job_desc_url, job_desc_text], queue=False, show_progress="hidden")
         resume_input_type.change(toggle_resume_input, inputs=[
-                                 resume_input_type], outputs=[resume_text, resume_file])
+                                 resume_input_type], outputs=[resume_text, resume_file],
+                                 queue=False, show_progress="hidden")
 
         match_btn.click(on_match, [job_input_type, job_desc_url, job_desc_text,
-                        resume_input_type, resume_text, resume_file, result_box], result_box)
+                        resume_input_type, resume_text, resume_file, result_box], result_box,
+                        concurrency_limit=MATCH_CONCURRENCY)
 
         clear.click(lambda: None,
-                    None, [result_box], queue=False)
+                    None, [result_box], queue=False, show_progress="hidden")
         return {"result_box": result_box, "match_btn": match_btn, "clear": clear, "job_input_type": job_input_type, "job_desc_url": job_desc_url, "job_desc_text": job_desc_text, "resume_input_type": resume_input_type, "resume_text": resume_text, "resume_file": resume_file}
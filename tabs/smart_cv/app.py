@@ -20,7 +20,7 @@ from .utils import auto_fill_from_job_description
 
 def build_ui():
     config = load_config()
-    with gr.Blocks(title="Smart CV & Cover Letter Generator", theme="soft") as app:
+    with gr.Blocks(title="Smart CV & Cover Letter Generator", theme="soft", analytics_enabled=False) as app:
         gr.Markdown("# 📄 Smart CV & Cover Letter Generator")
 
         # Model selection section
@@ -1,10 +1,10 @@
 import os
 from typing import Tuple
 
-import anthropic
-import openai
 import requests
 
+from providers.clients import anthropic_client, openai_client
+
 from .config import CLAUDE_ANTHROPIC, GPT_OPENAI, OLLAMA_LOCAL
 
 
@@ -13,7 +13,7 @@ def call_claude(system_prompt: str, user_prompt: str, config: dict) -> Tuple[boo
     if not api_key:
         return False, "Anthropic API key not configured"
     try:
-        client = anthropic.Anthropic(api_key=api_key)
+        client = anthropic_client(api_key)
         # Note: anthropic client API varies — adapt if needed
         message = client.messages.create(
             model=config.get("claude_model") or "claude-sonnet-4-20250514",
@@ -37,7 +37,7 @@ def call_openai(system_prompt: str, user_prompt: str, config: dict) -> Tuple[boo
     if not api_key:
         return False, "OpenAI API key not configured"
     try:
-        client = openai.OpenAI(api_key=api_key)
+        client = openai_client(api_key)
         response = client.chat.completions.create(
             model=config.get("openai_model") or "gpt-4-turbo-preview",
             max_tokens=config.get("max_tokens", 4000),
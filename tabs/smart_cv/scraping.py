@@ -2,7 +2,8 @@ import json
 import re
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 def _basic_headers():
@@ -10,14 +11,56 @@ def _basic_headers():
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Accept-Language": "en-US,en;q=0.9",
+        "Accept-Encoding": "gzip, deflate",
     }
 
 
+def _build_session():
+    """One keep-alive session for all profile fetches, retrying transient failures."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504)),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(_basic_headers())
+    return session
+
+
+_SESSION = _build_session()
+# Seconds to wait for the TCP connect; the read timeout is per call
+CONNECT_TIMEOUT = 3.05
+# Largest page body read before parsing; the rest is ignored
+MAX_PAGE_BYTES = 4_000_000
+
+
+def _parse_html(html):
+    # bs4 and lxml load on the first scrape rather than at app startup
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "lxml")
+
+
+def _fetch_html(url, timeout):
+    """Download at most MAX_PAGE_BYTES of an HTML page."""
+    with _SESSION.get(url, stream=True, timeout=(CONNECT_TIMEOUT, timeout)) as r:
+        r.raise_for_status()
+        content_type = r.headers.get("Content-Type", "")
+        if "html" not in content_type:
+            raise ValueError(f"Expected an HTML page, got {content_type or 'unknown content type'}")
+        body = bytearray()
+        for chunk in r.iter_content(65536):
+            body.extend(chunk)
+            if len(body) >= MAX_PAGE_BYTES:
+                break
+        return bytes(body[:MAX_PAGE_BYTES])
+
+
 def scrape_generic_profile(url, timeout=15):
     try:
-        r = requests.get(url, headers=_basic_headers(), timeout=timeout)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.content, "html.parser")
+        soup = _parse_html(_fetch_html(url, timeout))
         for tag in soup(["script", "style", "nav", "footer", "header"]):
             tag.decompose()
         text_content = soup.get_text(separator="\n", strip=True)
@@ -53,9 +96,7 @@ def scrape_linkedin(url, timeout=15):
     """Attempt to gather public metadata from LinkedIn pages. LinkedIn actively blocks scraping —
     this function is best-effort and returns a friendly error when blocked."""
     try:
-        r = requests.get(url, headers=_basic_headers(), timeout=timeout)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.content, "html.parser")
+        soup = _parse_html(_fetch_html(url, timeout))
         info = {
             "name": "",
             "headline": "",
@@ -14,7 +14,7 @@ from .components.chat_phase import create_chat_phase_ui
 
 # Import handlers
 from .handlers.input_handlers import toggle_input_method, process_notes
-from .handlers.chat_handlers import handle_question_clean_ui, get_ai_response_with_context
+from .handlers.chat_handlers import handle_question_clean_ui
 from .handlers.navigation_handlers import reset_to_input_phase
 
 
@@ -63,7 +63,9 @@ def _setup_event_handlers(input_components: dict, chat_components: dict, notes_s
         toggle_input_method,
         inputs=[input_components["input_method"]],
         outputs=[input_components["paste_input"],
-                 input_components["file_input"]]
+                 input_components["file_input"]],
+        queue=False,
+        show_progress="hidden"
     )
 
     # Process notes and switch phases
@@ -82,9 +84,11 @@ def _setup_event_handlers(input_components: dict, chat_components: dict, notes_s
         ]
     )
 
-    # Handle questions with clean UI
-    chat_components["ask_btn"].click(
-        handle_question_clean_ui,
+    # Handle questions with clean UI; shows the question, then streams the answer.
+    # Clicking Ask and pressing Enter share one registration.
+    gr.on(
+        triggers=[chat_components["ask_btn"].click, chat_components["question"].submit],
+        fn=handle_question_clean_ui,
         inputs=[
             notes_state,
             chat_components["question"],
@@ -95,19 +99,15 @@ def _setup_event_handlers(input_components: dict, chat_components: dict, notes_s
         outputs=[
             chat_components["question"],
             chat_components["chatbot"]
-        ],
-        queue=False
-    ).then(
-        get_ai_response_with_context,
-        inputs=[chat_components["chatbot"]],
-        outputs=[chat_components["chatbot"]]
+        ]
     )
 
     # Clear chat
     chat_components["clear"].click(
         lambda: None,
         outputs=[chat_components["chatbot"]],
-        queue=False
+        queue=False,
+        show_progress="hidden"
     )
 
     # Reset to input phase
@@ -121,5 +121,7 @@ def _setup_event_handlers(input_components: dict, chat_components: dict, notes_s
             input_components["file_upload"],
             input_components["input_method"],
             chat_components["question"]
-        ]
+        ],
+        queue=False,
+        show_progress="hidden"
     )
@@ -22,7 +22,7 @@ def create_chat_phase_ui():
         with gr.Row():
             question = gr.Textbox(
                 label="Your Question",
-                lines=2,
+                lines=1,
                 placeholder="Ask a question about the notes...",
                 scale=4
             )
@@ -3,7 +3,7 @@ Input phase UI components for study notes tab.
 Contains the initial input selection interface and file upload functionality.
 """
 import gradio as gr
-from ..utils.file_readers import get_supported_file_types
+from ..utils.file_readers import SUPPORTED_FILE_TYPES
 
 
 def create_input_phase_ui():
@@ -32,6 +32,7 @@ def create_input_phase_ui():
             notes_textbox = gr.Textbox(
                 label="Study Notes",
                 lines=10,
+                interactive=True,
                 placeholder="Paste or type your study notes here..."
             )
 
@@ -39,7 +40,7 @@ def create_input_phase_ui():
         with file_input:
             file_upload = gr.File(
                 label="Upload Study Notes",
-                file_types=get_supported_file_types(),
+                file_types=list(SUPPORTED_FILE_TYPES),
                 type="filepath"
             )
 
@@ -4,15 +4,19 @@ Provides helper functions for Gradio component updates and visibility management
 """
 import gradio as gr
 
+# Visibility-only updates are never mutated by Gradio, so one copy of each is shared
+_SHOW = gr.update(visible=True)
+_HIDE = gr.update(visible=False)
+
 
 def show_component():
     """Return Gradio update to make component visible."""
-    return gr.update(visible=True)
+    return _SHOW
 
 
 def hide_component():
     """Return Gradio update to hide component."""
-    return gr.update(visible=False)
+    return _HIDE
 
 
 def toggle_visibility(show_first: bool):
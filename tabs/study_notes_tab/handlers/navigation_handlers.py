@@ -3,7 +3,30 @@ Navigation handling logic for study notes tab.
 Manages phase transitions, resets, and UI state changes.
 """
 import gradio as gr
-from ..components.ui_state import show_component, hide_component, reset_component_value
+from ..components.ui_state import show_component, hide_component
+
+
+def get_default_input_method():
+    """
+    Get the default input method.
+
+    Returns:
+        Default input method string
+    """
+    return "Paste Notes"
+
+
+# Built once. Values are plain rather than gr.update(value=...) because Gradio
+# pops "value" out of update dicts, which would break a shared tuple
+_INPUT_PHASE_RESET = (
+    "",                           # notes_state
+    show_component(),             # input_phase
+    hide_component(),             # chat_phase
+    "",                           # notes_textbox
+    None,                         # file_upload
+    get_default_input_method(),   # input_method
+    ""                            # question
+)
 
 
 def reset_to_input_phase():
@@ -13,15 +36,7 @@ def reset_to_input_phase():
     Returns:
         Tuple of updates for all relevant components
     """
-    return (
-        "",                           # notes_state
-        show_component(),             # input_phase
-        hide_component(),             # chat_phase
-        reset_component_value("", ""), # notes_textbox
-        reset_component_value("", None), # file_upload
-        reset_component_value("", "Paste Notes"), # input_method
-        reset_component_value("", "")  # question
-    )
+    return _INPUT_PHASE_RESET
 
 
 def clear_chat():
@@ -34,16 +49,6 @@ def clear_chat():
     return []
 
 
-def get_default_input_method():
-    """
-    Get the default input method.
-
-    Returns:
-        Default input method string
-    """
-    return "Paste Notes"
-
-
 def get_default_style_options():
     """
     Get default answer style options.
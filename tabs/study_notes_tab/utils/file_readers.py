@@ -3,8 +3,18 @@ File reading utilities for study notes tab.
 Supports multiple document formats: TXT, MD, PDF, DOCX.
 """
 import os
-from PyPDF2 import PdfReader
-from docx import Document
+import threading
+from pathlib import Path
+
+from cachetools import LRUCache
+
+SUPPORTED_FILE_TYPES = (".txt", ".md", ".pdf", ".docx")
+
+# Extracted text by (path, mtime, size); least recently used entries are evicted
+FILE_CACHE_SIZE = 16
+_file_text_cache = LRUCache(maxsize=FILE_CACHE_SIZE)
+# process_notes runs in Gradio worker threads; parsing happens outside the lock
+_file_text_lock = threading.Lock()
 
 
 def read_uploaded_file(file_path: str) -> str:
@@ -21,42 +31,75 @@ def read_uploaded_file(file_path: str) -> str:
         return ""
 
     try:
-        # Get file extension
-        _, ext = os.path.splitext(file_path.lower())
+        # Re-processing the same upload skips parsing while the file is unchanged
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_mtime_ns, stat.st_size)
+        with _file_text_lock:
+            if key in _file_text_cache:
+                return _file_text_cache[key]
 
-        if ext == '.pdf':
-            return _read_pdf_file(file_path)
-        elif ext == '.docx':
-            return _read_docx_file(file_path)
-        else:
-            return _read_text_file(file_path)
+        text = _reader_for(file_path)(file_path)
 
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
+    with _file_text_lock:
+        _file_text_cache[key] = text
+    return text
+
 
 def _read_pdf_file(file_path: str) -> str:
     """Read PDF file and extract text from all pages."""
-    reader = PdfReader(file_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() + "\n"
-    return text.strip()
+    # Imported here so the PDF backend only loads when a PDF is uploaded
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        # Image-only pages have no text layer; skip them instead of adding blank lines
+        texts = (page.get_textpage().get_text_range() for page in pdf)
+        return "\n".join(text for text in texts if text).strip()
+    finally:
+        pdf.close()
 
 
 def _read_docx_file(file_path: str) -> str:
     """Read DOCX file and extract text from all paragraphs."""
+    from docx import Document
+
     doc = Document(file_path)
-    text = ""
-    for paragraph in doc.paragraphs:
-        text += paragraph.text + "\n"
-    return text.strip()
+    return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
 
 
 def _read_text_file(file_path: str) -> str:
     """Read plain text files (.txt, .md, etc.)."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return f.read()
+    return Path(file_path).read_text(encoding='utf-8')
+
+
+_READERS = {
+    ".pdf": _read_pdf_file,
+    ".docx": _read_docx_file,
+    ".txt": _read_text_file,
+    ".md": _read_text_file,
+}
+
+
+# Leading bytes of the binary formats, so renamed uploads still reach the right parser
+_MAGIC_READERS = (
+    (b"%PDF", _read_pdf_file),
+    (b"PK\x03\x04", _read_docx_file),
+)
+
+
+def _reader_for(file_path: str):
+    """Pick a reader from the file's leading bytes, falling back to its extension."""
+    with open(file_path, 'rb') as f:
+        head = f.read(4)
+    for magic, reader in _MAGIC_READERS:
+        if head.startswith(magic):
+            return reader
+    # Unknown extensions are read as plain text
+    ext = os.path.splitext(file_path)[1].lower()
+    return _READERS.get(ext, _read_text_file)
 
 
 def get_supported_file_types() -> list[str]:
@@ -66,4 +109,4 @@ def get_supported_file_types() -> list[str]:
     Returns:
         List of supported file extensions
     """
-    return [".txt", ".md", ".pdf", ".docx"]
\ No newline at end of file
+    return list(SUPPORTED_FILE_TYPES)
\ No newline at end of file
@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+
+import cache
+from cache import cached_stream, singleflight_stream
+
+ANSWER = "abcd"
+
+
+async def fake_completion(calls: list):
+    """Yield the cumulative text of ANSWER one character at a time."""
+    calls.append(1)
+    for end in range(1, len(ANSWER) + 1):
+        await asyncio.sleep(0)
+        yield ANSWER[:end]
+
+
+class SingleflightTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        cache.exact_cache.clear()
+        cache.inflight.clear()
+
+    def cached(self, key: str, calls: list):
+        stream = singleflight_stream(key, fake_completion(calls))
+        return cached_stream(None, stream, exact_key=key)
+
+    async def test_followers_share_one_upstream_call(self):
+        calls = []
+        results = await asyncio.gather(*(self.collect(self.cached("k", calls)) for _ in range(3)))
+
+        self.assertEqual(len(calls), 1)
+        for result in results:
+            self.assertEqual(result[-1], ANSWER)
+        self.assertEqual(cache.exact_cache["k"], ANSWER)
+
+    async def test_follower_finishes_after_leader_disconnects(self):
+        calls = []
+        leader = self.cached("k", calls)
+        self.assertEqual(await anext(leader), "a")
+
+        follower = asyncio.create_task(self.collect(self.cached("k", calls)))
+        await asyncio.sleep(0)  # let the follower subscribe
+        self.assertEqual(await anext(leader), "ab")
+        await leader.aclose()
+
+        result = await follower
+        self.assertEqual(result[-1], ANSWER)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.exact_cache["k"], ANSWER)
+        self.assertNotIn("k", cache.inflight)
+
+    async def test_truncated_stream_is_not_cached(self):
+        calls = []
+        leader = self.cached("k", calls)
+        await anext(leader)
+        await leader.aclose()
+
+        self.assertNotIn("k", cache.exact_cache)
+        self.assertNotIn("k", cache.inflight)
+
+    @staticmethod
+    async def collect(stream) -> list:
+        return [result async for result in stream]
+
+
+if __name__ == "__main__":
+    unittest.main()
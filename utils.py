@@ -1,65 +1,46 @@
-import os
-
-import anthropic as anthropicai
-import google.generativeai as genai
 from dotenv import load_dotenv
-from openai import OpenAI
 
 load_dotenv(override=True)
 
-# Initialize OpenAI client
-openai = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-anthropic = anthropicai.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+from cache import cached_stream, prompt_key, semantic_scope, singleflight_stream
+from providers.async_client import AsyncLLM, batch_stream
+from providers.config import DEFAULT_COMPLETION, CompletionConfig
+
+# One async client for all providers; connections are pooled per provider
+llm = AsyncLLM()
 
 selectedModel: str = None
 systemMessage: str = None
 
 contextModelchanged: bool = False
 
+# Fixed model and sampling options for the direct provider helpers
+_OPENAI_MODEL = "gpt-4o-mini"
+_CLAUDE_MODEL = "claude-opus-4-1-20250805"
+_CLAUDE_OPTIONS = {"max_tokens": 1024, "temperature": 0.7}
+_GEMMA_MODEL = "gemini-1.5-pro"
+_GEMMA_OPTIONS = {"temperature": 0.7, "max_tokens": 1024, "top_p": 0.95}
+
 
-def streamOpenAI(history: list):
-    result: str = ""
-    response = openai.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=history,
-        stream=True)
+async def streamOpenAI(history: list):
+    response = llm.stream(_OPENAI_MODEL, list(history))
     history.append({"role": "assistant", "content": ""})
-    for chunk in response:
-        result += chunk.choices[0].delta.content or ""
-    for character in result:
-        history[-1]['content'] += character
+    async for result in batch_stream(response):
+        history[-1]['content'] = result
         yield history
 
 
-def streamClaude(history: list):
-    response = anthropic.messages.stream(
-        model="claude-opus-4-1-20250805",
-        max_tokens=1024,
-        temperature=0.7,
-        messages=history
-    )
-    result: str = ""
-    with response as stream:
-        for chunk in stream.text_stream:
-            result += chunk
-            yield result
-
-
-def streamGemma(history: list):
-    response = genai.chat.completions.create(
-        model="gemini-1.5-pro",
-        messages=history,
-        temperature=0.7,
-        max_output_tokens=1024,
-        top_p=0.95,
-        stream=True
-    )
-    result: str = ""
+async def streamClaude(history: list):
+    response = llm.stream(_CLAUDE_MODEL, history, **_CLAUDE_OPTIONS)
+    async for result in batch_stream(response):
+        yield result
+
+
+async def streamGemma(history: list):
+    response = llm.stream(_GEMMA_MODEL, list(history), **_GEMMA_OPTIONS)
     history.append({"role": "assistant", "content": ""})
-    for chunk in response:
-        result += chunk.text or ""
-        history[-1]['content'] += result
+    async for result in batch_stream(response):
+        history[-1]['content'] = result
         yield history
 
 
@@ -72,49 +53,60 @@ def onModelChange(model: str):
 
 def onSystemPromptChanged(prompt: str):
     global systemMessage
+    # Handlers re-send their fixed prompt on every click; only a real change resets context
+    if prompt == systemMessage:
+        return
     systemMessage = prompt
     global contextModelchanged
     contextModelchanged = True
 
 
 def userMessage(message: str, history: list):
-    messages = []
     global contextModelchanged
 
     if contextModelchanged:
+        # A new model or system prompt starts the conversation over
         history.clear()
-        system_prompt = [{"role": "system",
-                          "content": systemMessage if systemMessage is not None else "You are a comedian that tell jokes."}]
-        messages = system_prompt
+        history.append({"role": "system",
+                        "content": systemMessage if systemMessage is not None else "You are a comedian that tell jokes."})
         contextModelchanged = False
 
-    user_prompt = [{"role": "user", "content": message}]
-    messages = history + user_prompt
-    return "", messages
+    return "", history + [{"role": "user", "content": message}]
 
 
-def responseStream(history: list):
-    result: str = ""
-    response = openai.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=history,
-        stream=True)
+async def responseStream(history: list, config: CompletionConfig = DEFAULT_COMPLETION,
+                         query: str = None, context=None):
+    messages = list(history)
     history.append({"role": "assistant", "content": ""})
-    for chunk in response:
-        result += chunk.choices[0].delta.content or ""
-    for character in result:
-        history[-1]['content'] += character
+    # streamAIResponse already throttles to one update per STREAM_FLUSH_MS
+    async for result in streamAIResponse(messages, config=config, query=query, context=context):
+        history[-1]['content'] = result
         yield history
 
-def streamAIResponse(messages: list):
-    response = openai.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=messages,
-        stream=True)
-    
-    result = ""
-    for chunk in response:
-        if chunk.choices[0].delta.content:
-            result += chunk.choices[0].delta.content
-            yield result
-
+async def streamAIResponse(messages: list, config: CompletionConfig = DEFAULT_COMPLETION,
+                           semantic: bool = True, query: str = None, context=None):
+    """
+    Stream a completion through the response caches.
+
+    The semantic cache only embeds the short query (by default the last
+    message); the model, earlier messages and context must match exactly.
+    Pass semantic=False when a near match could belong to different inputs.
+    """
+    exact_key = prompt_key(config.model, messages, config.temperature)
+    scope = None
+    if semantic:
+        if query is None:
+            query = messages[-1]["content"]
+        scope = semantic_scope(config.model, messages[:-1], context)
+    # Identical requests already in flight share one upstream call
+    stream = singleflight_stream(exact_key, _streamAIResponse(messages, config))
+    async for result in cached_stream(query if semantic else None, stream,
+                                      exact_key=exact_key, scope=scope):
+        yield result
+
+
+async def _streamAIResponse(messages: list, config: CompletionConfig):
+    tokens = llm.stream(config.model, messages, timeout=config.request_timeout,
+                        **config.sampling_options())
+    async for result in batch_stream(tokens):
+        yield result